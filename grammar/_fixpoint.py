@@ -0,0 +1,130 @@
+"""
+Optional Numba-compiled kernels for the FIRST/FOLLOW fixed points.
+
+Sets of terminals are encoded as ``uint64`` bitmasks, one bit per terminal
+(including the empty string and ``$``). Productions are encoded as CSR
+arrays: ``lefts[p]`` is the id of the left symbol of production ``p`` and
+its right side is ``rhs_sym[rhs_off[p]:rhs_off[p + 1]]``, where a terminal
+is stored as its bit index and the non terminal with id ``k`` as
+``-(k + 1)``.
+
+If Numba is not installed the kernels are ``None`` and callers must use
+the pure Python implementation.
+"""
+
+from __future__ import annotations
+
+MAX_TERMINALS = 64
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    first_fixpoint = None
+    follow_fixpoint = None
+else:
+    @njit(cache=True, nogil=True)
+    def first_fixpoint(lefts, rhs_off, rhs_sym, first, eps):
+        """
+        Computes the first sets of every non terminal.
+
+        Args:
+            lefts: id of the left symbol of each production.
+            rhs_off: offsets of each right side in ``rhs_sym``.
+            rhs_sym: symbols of all the right sides.
+            first: initial first set of each non terminal, usually empty.
+                It is updated in place.
+            eps: bitmask of the empty string.
+
+        Returns:
+            ``first``.
+        """
+        one = np.uint64(1)
+        not_eps = ~eps
+        changed = True
+        while changed:
+            changed = False
+            for p in range(lefts.shape[0]):
+                rhs_mask = np.uint64(0)
+                nullable = True
+                for j in range(rhs_off[p], rhs_off[p + 1]):
+                    sym = rhs_sym[j]
+                    if sym >= 0:
+                        rhs_mask |= one << np.uint64(sym)
+                        nullable = False
+                        break
+                    first_nt = first[-sym - 1]
+                    rhs_mask |= first_nt & not_eps
+                    if not first_nt & eps:
+                        nullable = False
+                        break
+                if nullable:
+                    rhs_mask |= eps
+                left = lefts[p]
+                new = first[left] | rhs_mask
+                if new != first[left]:
+                    first[left] = new
+                    changed = True
+        return first
+
+    @njit(cache=True, nogil=True)
+    def follow_fixpoint(lefts, rhs_off, rhs_sym, first, follow, eps):
+        """
+        Computes the follow sets of every non terminal.
+
+        Args:
+            lefts: id of the left symbol of each production.
+            rhs_off: offsets of each right side in ``rhs_sym``.
+            rhs_sym: symbols of all the right sides.
+            first: first set of each non terminal.
+            follow: initial follow set of each non terminal. It is
+                updated in place.
+            eps: bitmask of the empty string.
+
+        Returns:
+            ``follow``.
+        """
+        one = np.uint64(1)
+        not_eps = ~eps
+        changed = True
+        while changed:
+            changed = False
+            for p in range(lefts.shape[0]):
+                # Walk the right side backwards, keeping the set of terminals
+                # that can follow the current symbol.
+                trailer = follow[lefts[p]]
+                for j in range(rhs_off[p + 1] - 1, rhs_off[p] - 1, -1):
+                    sym = rhs_sym[j]
+                    if sym >= 0:
+                        trailer = one << np.uint64(sym)
+                    else:
+                        nt = -sym - 1
+                        new = follow[nt] | trailer
+                        if new != follow[nt]:
+                            follow[nt] = new
+                            changed = True
+                        first_nt = first[nt]
+                        if first_nt & eps:
+                            trailer = trailer | (first_nt & not_eps)
+                        else:
+                            trailer = first_nt
+        return follow
+
+    # Compile (or load from the on-disk cache) at import time, so the first
+    # grammar built does not pay for it.
+    first_fixpoint(
+        np.zeros(1, np.int32),
+        np.array([0, 1], np.int32),
+        np.array([-1], np.int32),
+        np.zeros(1, np.uint64),
+        np.uint64(2),
+    )
+    follow_fixpoint(
+        np.zeros(1, np.int32),
+        np.array([0, 1], np.int32),
+        np.array([-1], np.int32),
+        np.zeros(1, np.uint64),
+        np.ones(1, np.uint64),
+        np.uint64(2),
+    )
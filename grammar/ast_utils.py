@@ -1,7 +1,57 @@
-from ast import NodeVisitor, AST, iter_fields, NodeTransformer
+from __future__ import annotations
+
+from ast import NodeVisitor, AST, NodeTransformer
 import inspect
 import types
 import ast
+from typing import Callable
+
+
+_SCALAR, _NODE, _LIST, _OPTIONAL = range(4)
+_MISSING = object()
+
+_FIELD_CACHE: dict[type, tuple[tuple[str, int], ...]] = {}
+
+
+def _classify(cls, sample_node):
+  """
+  Classify the fields of an AST node class, in declaration order, as
+  scalar, node, list or optional (``None`` or missing in the sample, so
+  its kind has to be checked on every visit). Node fields may still be
+  ``None`` in other instances. The result is cached per class.
+  """
+  fields = _FIELD_CACHE.get(cls)
+  if fields is None:
+    kinds = []
+    for name in cls._fields:
+      value = getattr(sample_node, name, None)
+      if value is None:
+        kinds.append((name, _OPTIONAL))
+      elif isinstance(value, list):
+        kinds.append((name, _LIST))
+      elif isinstance(value, AST):
+        kinds.append((name, _NODE))
+      else:
+        kinds.append((name, _SCALAR))
+    fields = _FIELD_CACHE[cls] = tuple(kinds)
+  return fields
+
+
+def _iter_child_nodes(node):
+  """Yield the direct AST children of a node, in field order."""
+  for field, kind in _classify(type(node), node):
+    if kind == _SCALAR:
+      continue
+    value = getattr(node, field, None)
+    if kind == _LIST:
+      for item in value:
+        if isinstance(item, AST):
+          yield item
+    elif kind == _NODE:
+      if value is not None:
+        yield value
+    elif isinstance(value, AST):
+      yield value
 
 
 def transform_code(f, transformer):
@@ -13,51 +63,128 @@ def transform_code(f, transformer):
   return new_f
 
 
-class ASTMagicNumberDetector(NodeVisitor):
+def transform_code_with(f, n):
+  """
+  Replace every constant of ``f`` by ``n`` and remove the ifs whose test
+  becomes constant, in a single pass over the tree.
+  """
+  return transform_code(f, ASTFoldConstants(n))
+
+
+class _CachedDispatchVisitor(NodeVisitor):
+    """
+    Visitor that resolves the ``visit_<NodeClass>`` method once per node
+    class instead of building the name and looking it up on every visit.
+    Each subclass gets its own cache.
+    """
+    _visitor_cache: dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visitor_cache = {}
+
+    def visit(self, node):
+        cls = type(self)
+        method = cls._visitor_cache.get(type(node))
+        if method is None:
+            method = getattr(cls, 'visit_' + type(node).__name__, cls.generic_visit)
+            cls._visitor_cache[type(node)] = method
+        return method(self, node)
+
+
+class ASTMagicNumberDetector(_CachedDispatchVisitor):
     magic_numbers = 0
 
-    def check_value(self, value):
-        if value not in [0, 1, 1j]:
-            self.magic_numbers += 1
+    # generic_visit only prunes the descent, so the visitor can still run
+    # inside a CompositeVisitor.
+    _generic_visit_only_descends = True
 
-    def visit_Num(self, node):
-        if self.check_value(node.n):
-            self.magic_numbers += 1
+    # Fields that only ever hold expression contexts or operators, which
+    # cannot contain constants.
+    _operator_fields = frozenset({'ctx', 'op', 'ops'})
+    _child_fields: dict[type, tuple[tuple[str, int], ...]] = {}
 
     def visit_Constant(self, node):
-        if self.check_value(node.value):
+        value = node.value
+        if value != 0 and value != 1 and value != 1j:
             self.magic_numbers += 1
 
+    def generic_visit(self, node):
+        cls = type(node)
+        fields = self._child_fields.get(cls)
+        if fields is None:
+            fields = self._child_fields[cls] = tuple(
+                (field, kind) for field, kind in _classify(cls, node)
+                if kind != _SCALAR and field not in self._operator_fields
+            )
 
-class ASTDotVisitor(NodeVisitor):
+        visit = self.visit
+        for field, kind in fields:
+            value = getattr(node, field, None)
+            if kind == _LIST:
+                for item in value:
+                    if isinstance(item, AST):
+                        visit(item)
+            elif kind == _NODE:
+                if value is not None:
+                    visit(value)
+            elif isinstance(value, AST):
+                visit(value)
+
+
+class ASTDotVisitor(_CachedDispatchVisitor):
     def __init__(self):
         self.txt = "digraph{\n"
+        self._chunks = [self.txt]
         self.n_node = 0
 
-    def generic_visit(self, node, n=0):
-        node_values = []
-        for field, value in iter_fields(node):
-            if not (isinstance(value, list) or isinstance(value, AST)):
-                node_values.append(str(field) + "=" + repr(value))
-        self.txt += f's{self.n_node} [label="{node.__class__.__name__}({", ".join(node_values)})"]\n'
-        self.n_node += 1
+    def visit(self, node):
+        super().visit(node)
+        self._chunks.append("\n}")
+        self.txt = "".join(self._chunks)
+        print(self.txt)
 
-        for field, value in iter_fields(node):
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, AST):
-                        self.txt += f's{n} -> s{self.n_node} [label="{field}"]\n'
-                        self.generic_visit(item, self.n_node)
-            elif isinstance(value, AST):
-                self.txt += f's{n} -> s{self.n_node} [label="{field}"]\n'
-                self.generic_visit(value, self.n_node)
+    def generic_visit(self, node):
+        append = self._chunks.append
+        stack = [(node, None, None)]
+        push = stack.append
+        pop = stack.pop
+        n_node = self.n_node
 
-        if n == 0:
-            self.txt += "\n}"
-            print(self.txt)
+        while stack:
+            node, parent, parent_field = pop()
+            if parent is not None:
+                append(f's{parent} -> s{n_node} [label="{parent_field}"]\n')
 
+            node_values = []
+            children = []
+            for field, kind in _classify(type(node), node):
+                value = getattr(node, field, _MISSING)
+                if value is _MISSING:
+                    continue
+                if kind == _OPTIONAL:
+                    kind = _NODE if isinstance(value, AST) else _SCALAR
+                elif kind == _NODE and value is None:
+                    kind = _SCALAR
+                if kind == _SCALAR:
+                    node_values.append(field + "=" + repr(value))
+                elif kind == _NODE:
+                    children.append((field, value))
+                else:
+                    for item in value:
+                        if isinstance(item, AST):
+                            children.append((field, item))
+            append(f's{n_node} [label="{node.__class__.__name__}({", ".join(node_values)})"]\n')
 
-class ASTReplaceNum(NodeTransformer):
+            # Pushed in reverse so they are emitted in field order.
+            for field, child in reversed(children):
+                push((child, n_node, field))
+            n_node += 1
+
+        self.n_node = n_node
+
+
+class ASTReplaceNum(_CachedDispatchVisitor, NodeTransformer):
     def __init__(self, n) -> None:
         super().__init__()
         self.n = n
@@ -71,11 +198,92 @@ class ASTReplaceNum(NodeTransformer):
         return node
 
 
-class ASTRemoveConstantIf(NodeTransformer):
-    def visit_If(self, node):        
-        if type(node.test) == ast.Constant:
-            if node.test.value == True:
-                return self.visit(node.body[0])
-            elif node.test.value == False:
-                return self.visit(node.orelse[0])
-        return self.visit(node)
+class ASTRemoveConstantIf(_CachedDispatchVisitor, NodeTransformer):
+    def visit_If(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant):
+            kept = node.body if node.test.value else node.orelse
+            if not kept:
+                return ast.copy_location(ast.Pass(), node)
+            return kept
+        return node
+
+
+class ASTFoldConstants(ASTReplaceNum, ASTRemoveConstantIf):
+    """
+    Combination of :class:`ASTReplaceNum` and :class:`ASTRemoveConstantIf`
+    that needs a single traversal. Children of an ``If`` are transformed
+    before its test is inspected, so the replacement is already applied.
+    Constants are updated in place.
+
+    Args:
+        n: value that replaces every constant.
+    """
+
+
+class CompositeVisitor(NodeVisitor):
+    """
+    Runs several visitors in a single traversal.
+
+    For every node, the ``visit_<NodeClass>`` method of each visitor that
+    defines one is called, and then the composite descends into the
+    children itself, so those methods must not recurse on their own.
+    Visitors whose logic lives in ``visit`` or ``generic_visit`` (such as
+    :class:`ASTDotVisitor`) would silently do nothing and are rejected,
+    as are transformers, which change the tree being walked.
+
+    Args:
+        visitors: visitors to run.
+    """
+
+    def __init__(self, visitors):
+        visitors = list(visitors)
+        for v in visitors:
+            cls = type(v)
+            if isinstance(v, NodeTransformer):
+                raise TypeError(
+                    f"{cls.__name__} is a NodeTransformer, only "
+                    f"NodeVisitors can be combined.",
+                )
+            if cls.visit not in (NodeVisitor.visit, _CachedDispatchVisitor.visit):
+                raise TypeError(
+                    f"{cls.__name__} overrides visit, which would not be "
+                    f"called by a CompositeVisitor.",
+                )
+            if (
+                cls.generic_visit is not NodeVisitor.generic_visit
+                and not getattr(cls, '_generic_visit_only_descends', False)
+            ):
+                raise TypeError(
+                    f"{cls.__name__} overrides generic_visit, which would "
+                    f"not be called by a CompositeVisitor.",
+                )
+            if not any(
+                name.startswith('visit_')
+                and getattr(cls, name) is not getattr(NodeVisitor, name, None)
+                for name in dir(cls)
+            ):
+                raise TypeError(
+                    f"{cls.__name__} defines no visit_<NodeClass> methods.",
+                )
+        self.visitors = visitors
+        self.dispatch: dict[type, list[Callable]] = {}
+
+    def visit(self, node):
+        cls = type(node)
+        methods = self.dispatch.get(cls)
+        if methods is None:
+            name = 'visit_' + cls.__name__
+            default = getattr(NodeVisitor, name, None)
+            methods = self.dispatch[cls] = [
+                getattr(v, name) for v in self.visitors
+                if getattr(type(v), name, default) is not default
+            ]
+        for method in methods:
+            method(node)
+        self.generic_visit(node)
+
+    def generic_visit(self, node):
+        visit = self.visit
+        for child in _iter_child_nodes(node):
+            visit(child)
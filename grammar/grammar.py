@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from collections import deque, Set
-from typing import AbstractSet, Collection, MutableSet, Optional
+from functools import cached_property
+from typing import AbstractSet, Collection, Optional
+
+from grammar import _fixpoint
+
+_EMPTY: frozenset[str] = frozenset()
+_EPS: frozenset[str] = frozenset({''})
+_DOLLAR: frozenset[str] = frozenset({'$'})
 
 class RepeatedCellError(Exception):
     """Exception for repeated cells in LL(1) tables."""
@@ -21,6 +27,8 @@ class Production:
 
     """
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left: str, right: str) -> None:
         self.left = left
         self.right = right
@@ -94,6 +102,31 @@ class Grammar:
         self.productions = productions
         self.axiom = axiom
 
+        # A production whose right side is None is the empty production.
+        self._rules = [
+            (p.left, '' if p.right is None else p.right) for p in productions
+        ]
+
+        # Sets of terminals (plus the empty string and '$') are stored as
+        # bitmasks, with one bit per symbol.
+        self._id_term = sorted(terminals | {'', '$'})
+        self._term_id = {t: i for i, t in enumerate(self._id_term)}
+        self._decoded: dict[int, frozenset[str]] = {
+            0: _EMPTY,
+            1 << self._term_id['']: _EPS,
+            1 << self._term_id['$']: _DOLLAR,
+        }
+        if (
+            _fixpoint.first_fixpoint is not None
+            and len(self._id_term) <= _fixpoint.MAX_TERMINALS
+        ):
+            self._first_mask, self._follow_mask = (
+                self._compute_first_follow_native()
+            )
+        else:
+            self._first_mask = self._compute_all_first()
+            self._follow_mask = self._compute_all_follow()
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}("
@@ -103,18 +136,148 @@ class Grammar:
             f"productions={self.productions!r})"
         )
 
-    def compute_first_rec(self, sub_str: str):
-        if sub_str == '':
-            return set([''])
-        if sub_str[0] in self.terminals:
-            return set(sub_str[0])
-        
-        first_set = set()
-        for production in self.productions:
-            if sub_str[0] == production.left:
-                first_set |= self.compute_first_rec(production.right + sub_str[1:])
-        return first_set 
+    def _decode(self, mask: int) -> frozenset[str]:
+        """
+        Converts a bitmask into the set of symbols it represents. Results
+        are cached, so equal masks share the same frozenset.
+        """
+        symbols = self._decoded.get(mask)
+        if symbols is None:
+            id_term = self._id_term
+            bits = mask
+            found = []
+            while bits:
+                low = bits & -bits
+                found.append(id_term[low.bit_length() - 1])
+                bits ^= low
+            symbols = self._decoded[mask] = frozenset(found)
+        return symbols
+
+    def _compute_all_first(self) -> dict[str, int]:
+        """
+        Computes the first set bitmask of every non terminal by fixed
+        point iteration over the productions.
+        """
+        term_mask = {t: 1 << i for t, i in self._term_id.items()}
+        eps = term_mask['']
+        prods = self._rules
+        first = {A: 0 for A in self.non_terminals}
+        changed = True
+        while changed:
+            changed = False
+            for p_left, p_right in prods:
+                rhs_mask = 0
+                for s in p_right:
+                    mask = term_mask.get(s)
+                    if mask is not None:
+                        rhs_mask |= mask
+                        break
+                    first_s = first[s]
+                    rhs_mask |= first_s & ~eps
+                    if not first_s & eps:
+                        break
+                else:
+                    rhs_mask |= eps
+                new = first[p_left] | rhs_mask
+                if new != first[p_left]:
+                    first[p_left] = new
+                    changed = True
+        return first
+
+    def _compute_all_follow(self) -> dict[str, int]:
+        """
+        Computes the follow set bitmask of every non terminal by fixed
+        point iteration over the productions.
+        """
+        term_mask = {t: 1 << i for t, i in self._term_id.items()}
+        eps = term_mask['']
+        first = self._first_mask
+        prods = [(left, right[::-1]) for left, right in self._rules]
+        follows = {nt: 0 for nt in self.non_terminals}
+        follows[self.axiom] = term_mask['$']
+        changed = True
+        while changed:
+            changed = False
+            for p_left, reversed_right in prods:
+                # Walk the right side backwards, keeping the set of
+                # terminals that can follow the current symbol.
+                trailer = follows[p_left]
+                for s in reversed_right:
+                    mask = term_mask.get(s)
+                    if mask is not None:
+                        trailer = mask
+                        continue
+                    new = follows[s] | trailer
+                    if new != follows[s]:
+                        follows[s] = new
+                        changed = True
+                    first_s = first[s]
+                    if first_s & eps:
+                        trailer |= first_s & ~eps
+                    else:
+                        trailer = first_s
+        return follows
+
+    def _compute_first_follow_native(
+        self,
+    ) -> tuple[dict[str, int], dict[str, int]]:
+        """
+        Computes the first and follow set bitmasks of every non terminal
+        with the compiled kernels in :mod:`grammar._fixpoint`.
+        """
+        np = _fixpoint.np
+        term_id = self._term_id
+        nts = sorted(self.non_terminals)
+        nt_id = {A: k for k, A in enumerate(nts)}
+
+        lefts = []
+        rhs_off = [0]
+        rhs_sym = []
+        for left, right in self._rules:
+            lefts.append(nt_id[left])
+            for s in right:
+                rhs_sym.append(term_id[s] if s in term_id else -nt_id[s] - 1)
+            rhs_off.append(len(rhs_sym))
+        lefts = np.array(lefts, dtype=np.int32)
+        rhs_off = np.array(rhs_off, dtype=np.int32)
+        rhs_sym = np.array(rhs_sym, dtype=np.int32)
+        eps = np.uint64(1 << term_id[''])
+
+        first = _fixpoint.first_fixpoint(
+            lefts,
+            rhs_off,
+            rhs_sym,
+            np.zeros(len(nts), dtype=np.uint64),
+            eps,
+        )
+        follow = np.zeros(len(nts), dtype=np.uint64)
+        follow[nt_id[self.axiom]] = 1 << term_id['$']
+        follow = _fixpoint.follow_fixpoint(
+            lefts,
+            rhs_off,
+            rhs_sym,
+            first,
+            follow,
+            eps,
+        )
+        return (
+            {A: int(first[k]) for k, A in enumerate(nts)},
+            {A: int(follow[k]) for k, A in enumerate(nts)},
+        )
 
+    def _first_mask_of_string(self, sentence: str) -> int:
+        term_id = self._term_id
+        first = self._first_mask
+        eps = 1 << term_id['']
+        mask = 0
+        for s in sentence:
+            if s in term_id:
+                return mask | 1 << term_id[s]
+            first_s = first[s]
+            mask |= first_s & ~eps
+            if not first_s & eps:
+                return mask
+        return mask | eps
 
     def compute_first(self, sentence: str) -> AbstractSet[str]:
         """
@@ -126,11 +289,13 @@ class Grammar:
         Returns:
             First set of str.
         """
+        terminals = self.terminals
+        non_terminals = self.non_terminals
         for s in sentence:
-            if s not in self.terminals and s not in self.non_terminals:
+            if s not in terminals and s not in non_terminals:
                 raise ValueError("Sentence should be made up of terminal/non terminal nodes")
-            
-        return self.compute_first_rec(sentence)
+
+        return self._decode(self._first_mask_of_string(sentence))
 
 
     def compute_follow(self, symbol: str) -> AbstractSet[str]:
@@ -143,26 +308,30 @@ class Grammar:
         Returns:
             Follow set of symbol.
         """
-        follows = {nt:set() for nt in self.non_terminals}
-        follows[self.productions[0].left].add('$')
-        follows_old = follows.copy()
-
-        while True:
-            for p in self.productions:
-                for i, s in enumerate(p.right):
-                    if s in self.non_terminals:
-                        if i == len(p.right) - 1:
-                            follows[s] = follows[s].union(follows[p.left])
-                        else:
-                            first = self.compute_first(p.right[i+1:])
-                            if '' in first:
-                                follows[s] = follows[s].union(follows[p.left])
-                            follows[s] = follows[s].union(first - set(['']))
-            if follows == follows_old:
-                break
-            follows_old = follows.copy()
-        return follows[symbol]
-
+        return self._decode(self._follow_mask[symbol])
+
+
+    @cached_property
+    def _ll1_cells(self) -> Optional[dict[tuple[str, str], str]]:
+        """Cells of the LL(1) table, or None if the grammar is not LL(1)."""
+        eps = 1 << self._term_id['']
+        decode = self._decode
+        follow = self._follow_mask
+        cells: dict[tuple[str, str], str] = {}
+        for left, right in self._rules:
+            first = self._first_mask_of_string(right)
+            for t in decode(first & ~eps):
+                key = left, t
+                if key in cells:
+                    return None
+                cells[key] = right
+            if first & eps:
+                for t in decode(follow[left]):
+                    key = left, t
+                    if key in cells:
+                        return None
+                    cells[key] = right
+        return cells
 
     def get_ll1_table(self) -> Optional[LL1Table]:
         """
@@ -171,26 +340,19 @@ class Grammar:
         Returns:
             LL(1) table for the grammar, or None if the grammar is not LL(1).
         """
-        cells = []
-        used = set()
-        for p in self.productions:
-            for t in self.compute_first(p.right):
-                if t == '':
-                    for t2 in self.compute_follow(p.left):
-                        if (p.left, t2) in used:
-                            return None
-                        cells.append(TableCell(p.left, t2, p.right))
-                        used.add((p.left, t2))
-                else:
-                    if (p.left, t) in used:
-                        return None
-                    cells.append(TableCell(p.left, t, p.right))
-                    used.add((p.left, t))
-
-        return LL1Table(self.non_terminals, self.terminals.union(set('$')), cells)
+        cells = self._ll1_cells
+        if cells is None:
+            return None
+
+        # Each table gets its own copy, as add_cell mutates it.
+        return LL1Table._from_cell_dict(
+            self.non_terminals,
+            self.terminals | {'$'},
+            _CellDict(cells),
+        )
 
     def is_ll1(self) -> bool:
-        return self.get_ll1_table() is not None
+        return self._ll1_cells is not None
 
 class TableCell:
     """
@@ -203,6 +365,8 @@ class TableCell:
 
     """
 
+    __slots__ = ("non_terminal", "terminal", "right")
+
     def __init__(self, non_terminal: str, terminal: str, right: str) -> None:
         self.non_terminal = non_terminal
         self.terminal = terminal
@@ -226,6 +390,90 @@ class TableCell:
     def __hash__(self) -> int:
         return hash((self.non_terminal, self.terminal))
 
+class _CellDict(dict):
+    """
+    ``{(non_terminal, terminal): right}`` dict of the cells of an
+    :class:`LL1Table`.
+
+    It keeps the integer encoding of the cells used by
+    :meth:`LL1Table.analyze`, which is built on first use and dropped
+    whenever the dict is modified.
+    """
+
+    __slots__ = ("_packed",)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._packed = None
+
+    def __setitem__(self, key, value) -> None:
+        self._packed = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self._packed = None
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._packed = None
+        return super().__ior__(other)
+
+    def clear(self) -> None:
+        self._packed = None
+        super().clear()
+
+    def pop(self, *args):
+        self._packed = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._packed = None
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._packed = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        self._packed = None
+        super().update(*args, **kwargs)
+
+    def packed(self):
+        """
+        Integer encoding of the cells.
+
+        Every symbol gets an id, rows (symbols on the left of a cell) come
+        first. ``col_of[sym]`` is the column of a symbol, or -1, and the
+        cell of ``(row, col)`` is ``packed[row * n_cols + col]``: the right
+        side as reversed symbol ids, ready to push, or ``None``.
+
+        Returns:
+            ``(sym_id, col_of, n_rows, n_cols, packed)``.
+        """
+        if self._packed is None:
+            rows = sorted({A for A, _ in self})
+            cols = sorted({t for _, t in self})
+            sym_id = {A: k for k, A in enumerate(rows)}
+            for t in cols:
+                sym_id.setdefault(t, len(sym_id))
+            for right in self.values():
+                for s in right:
+                    sym_id.setdefault(s, len(sym_id))
+
+            col_of = [-1] * len(sym_id)
+            for j, t in enumerate(cols):
+                col_of[sym_id[t]] = j
+
+            n_cols = len(cols)
+            packed = [None] * (len(rows) * n_cols)
+            for (A, t), right in self.items():
+                packed[sym_id[A] * n_cols + col_of[sym_id[t]]] = tuple(
+                    sym_id[s] for s in reversed(right)
+                )
+
+            self._packed = sym_id, col_of, len(rows), n_cols, packed
+        return self._packed
+
 class LL1Table:
     """
     LL1 table.
@@ -277,6 +525,35 @@ class LL1Table:
         self.non_terminals = non_terminals
         self.cells = {(c.non_terminal, c.terminal): c.right for c in cells}
 
+    @classmethod
+    def _from_cell_dict(
+        cls,
+        non_terminals: AbstractSet[str],
+        terminals: AbstractSet[str],
+        cells: dict[tuple[str, str], str],
+    ) -> LL1Table:
+        """
+        Builds a table from a ``{(non_terminal, terminal): right}`` dict
+        without validating it. Only for callers that already guarantee
+        the symbols are valid, such as :meth:`Grammar.get_ll1_table`.
+        """
+        table = cls.__new__(cls)
+        table.terminals = terminals
+        table.non_terminals = non_terminals
+        table.cells = cells
+        return table
+
+    @property
+    def cells(self) -> dict[tuple[str, str], str]:
+        """``{(non_terminal, terminal): right}`` dict of the cells."""
+        return self._cells
+
+    @cells.setter
+    def cells(self, cells: dict[tuple[str, str], str]) -> None:
+        self._cells = (
+            cells if isinstance(cells, _CellDict) else _CellDict(cells)
+        )
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}("
@@ -316,19 +593,40 @@ class LL1Table:
         Raises:
             SyntaxError: if the input string is not syntactically correct.
         """
-        while len(start) > 0 and len(input_string) > 0:
-            key = start[0],  input_string[0]
-
-            if not key in self.cells:
+        sym_id, col_of, n_rows, n_cols, packed = self.cells.packed()
+        n_sym = len(sym_id)
+        get_id = sym_id.get
+
+        # Symbols unknown to the table get ids past n_sym. They have no
+        # cells, but can still match the same symbol in the input.
+        stack = [get_id(s, n_sym + ord(s)) for s in reversed(start)]
+        i = 0
+        n = len(input_string)
+        if n:
+            tok = get_id(input_string[0], n_sym + ord(input_string[0]))
+            col = col_of[tok] if tok < n_sym else -1
+
+        while stack and i < n:
+            top = stack[-1]
+
+            rhs = None
+            if top < n_rows and col >= 0:
+                rhs = packed[top * n_cols + col]
+
+            if rhs is not None:
+                stack.pop()
+                stack.extend(rhs)
+            elif top == tok:
+                stack.pop()
+                i += 1
+                if i < n:
+                    c = input_string[i]
+                    tok = get_id(c, n_sym + ord(c))
+                    col = col_of[tok] if tok < n_sym else -1
+            else:
                 raise SyntaxError("Not parsed")
 
-            start = self.cells[key] + start[1:]
-            
-            if len(start) > 0 and start[0] == input_string[0]:
-                input_string = input_string[1:]
-                start = start[1:]
-
-        if input_string != '$':
+        if i != n - 1 or input_string[i] != '$':
             raise SyntaxError("Not parsed")
 
         return ParseTree("") # Return an empty tree by default.
@@ -337,13 +635,22 @@ class ParseTree():
     """
     Parse Tree.
 
+    The structural hash of a tree is cached the first time it is computed,
+    so a tree (or any of its subtrees) should not be modified after being
+    hashed. Comparison does not use the cached hash.
+
     Args:
         root: root node of the tree.
         children: list of children, which are also ParseTree objects.
     """
-    def __init__(self, root: str, children: Collection[ParseTree] = []) -> None:
+    def __init__(
+        self,
+        root: str,
+        children: Optional[Collection[ParseTree]] = None,
+    ) -> None:
         self.root = root
-        self.children = children
+        self.children = [] if children is None else children
+        self._hash: Optional[int] = None
 
     def __repr__(self) -> str:
         return (
@@ -353,11 +660,19 @@ class ParseTree():
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, type(self)):
             return NotImplemented
+        if self is other:
+            return True
         return (
             self.root == other.root
             and len(self.children) == len(other.children)
-            and all([x.__eq__(y) for x, y in zip(self.children, other.children)])
+            and all(x == y for x, y in zip(self.children, other.children))
         )
 
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self.root, tuple(hash(c) for c in self.children)))
+        return self._hash
+
     def add_children(self, children: Collection[ParseTree]) -> None:
         self.children = children
+        self._hash = None
@@ -2,7 +2,14 @@ import ast
 import inspect
 import unittest
 
-from ast_utils import ASTRemoveConstantIf
+from ast_utils import (
+    _CachedDispatchVisitor,
+    ASTDotVisitor,
+    ASTMagicNumberDetector,
+    ASTRemoveConstantIf,
+    CompositeVisitor,
+    transform_code_with,
+)
 
 def simple_fun():
     if True:
@@ -19,6 +26,109 @@ def nested_fun():
     else:
         return 0
 
+def dynamic_fun(x):
+    if x:
+        return 1
+    if False:
+        return 2
+    elif True:
+        x += 1
+        return x
+    return 0
+
+def fold_fun(x):
+    if 1:
+        return x + 1
+    return x
+
+def magic_fun(x, y=3, *, z=0.5):
+    if x > 1:
+        return print(x * 2, sep=1j, end=4)
+    return y + 1 - 0
+
+class TestASTMagicNumberDetector(unittest.TestCase):
+    """Tests for ASTMagicNumberDetector."""
+
+    def test_magic_numbers(self) -> None:
+        """Test counting, including defaults and keyword values."""
+        source = inspect.getsource(magic_fun)
+        detector = ASTMagicNumberDetector()
+        detector.visit(ast.parse(source))
+        self.assertEqual(detector.magic_numbers, 4)
+
+class TestCachedDispatchVisitor(unittest.TestCase):
+    """Tests for _CachedDispatchVisitor."""
+
+    def test_sibling_caches(self) -> None:
+        """Test that sibling visitors do not share their dispatch cache."""
+        class First(_CachedDispatchVisitor):
+            def __init__(self):
+                self.seen = []
+
+            def visit_Name(self, node):
+                self.seen.append(("first", node.id))
+
+        class Second(_CachedDispatchVisitor):
+            def __init__(self):
+                self.seen = []
+
+            def visit_Name(self, node):
+                self.seen.append(("second", node.id))
+
+        tree = ast.parse("x + y")
+        first, second = First(), Second()
+        first.visit(tree)
+        second.visit(tree)
+        self.assertEqual(first.seen, [("first", "x"), ("first", "y")])
+        self.assertEqual(second.seen, [("second", "x"), ("second", "y")])
+        self.assertIsNot(First._visitor_cache, Second._visitor_cache)
+
+class TestCompositeVisitor(unittest.TestCase):
+    """Tests for CompositeVisitor."""
+
+    def test_single_traversal(self) -> None:
+        """Test running several visitors in one traversal."""
+        class ReturnCounter(ast.NodeVisitor):
+            returns = 0
+
+            def visit_Return(self, node):
+                self.returns += 1
+
+        source = inspect.getsource(magic_fun)
+        detector = ASTMagicNumberDetector()
+        counter = ReturnCounter()
+        CompositeVisitor([detector, counter]).visit(ast.parse(source))
+        self.assertEqual(detector.magic_numbers, 4)
+        self.assertEqual(counter.returns, 2)
+
+    def test_generator(self) -> None:
+        """Test passing the visitors as a generator."""
+        source = inspect.getsource(magic_fun)
+        detector = ASTMagicNumberDetector()
+        composite = CompositeVisitor(v for v in [detector])
+        composite.visit(ast.parse(source))
+        self.assertEqual(composite.visitors, [detector])
+        self.assertEqual(detector.magic_numbers, 4)
+
+    def test_transformer(self) -> None:
+        """Test that transformers are rejected."""
+        with self.assertRaises(TypeError):
+            CompositeVisitor([ASTRemoveConstantIf()])
+
+    def test_generic_visit_visitor(self) -> None:
+        """Test that visitors doing their work outside visit_* are rejected."""
+        class GenericCounter(ast.NodeVisitor):
+            nodes = 0
+
+            def generic_visit(self, node):
+                self.nodes += 1
+                super().generic_visit(node)
+
+        with self.assertRaises(TypeError):
+            CompositeVisitor([ASTMagicNumberDetector(), ASTDotVisitor()])
+        with self.assertRaises(TypeError):
+            CompositeVisitor([GenericCounter()])
+
 class TestIfASTRemoveConstantIf(unittest.TestCase):
     """Tests for ASTRemoveConstantIf."""
 
@@ -61,5 +171,28 @@ class TestIfASTRemoveConstantIf(unittest.TestCase):
         ret1val = ret1.value
         self._assertNumNodeValue(ret1val, 2)
 
+    def test_non_constant(self) -> None:
+        """Test non constant tests and branches with several statements."""
+        source = inspect.getsource(dynamic_fun)
+        parsed_ast = ast.parse(source)
+        transformed_ast = ASTRemoveConstantIf().visit(parsed_ast)
+
+        fundef = transformed_ast.body[0]
+        self.assertIsInstance(fundef, ast.FunctionDef)
+        self.assertEqual(len(fundef.body), 4)
+        self.assertIsInstance(fundef.body[0], ast.If)
+        self.assertIsInstance(fundef.body[1], ast.AugAssign)
+        self.assertIsInstance(fundef.body[2], ast.Return)
+        self.assertIsInstance(fundef.body[3], ast.Return)
+        self._assertNumNodeValue(fundef.body[3].value, 0)
+
+class TestTransformCodeWith(unittest.TestCase):
+    """Tests for transform_code_with."""
+
+    def test_fold(self) -> None:
+        """Test replacing constants and removing the resulting ifs."""
+        self.assertEqual(transform_code_with(fold_fun, 2)(1), 3)
+        self.assertEqual(transform_code_with(fold_fun, 0)(1), 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -188,6 +188,89 @@ class TestAnalyze(unittest.TestCase):
         grammar = GrammarFormat.read(grammar_str)
         self.assertEqual(grammar.get_ll1_table(), None)
 
+    def test_case7(self) -> None:
+        """Test productions with consecutive terminals."""
+        grammar_str = """
+        S -> ab*S
+        S -> c
+        """
+        grammar = GrammarFormat.read(grammar_str)
+
+        self._check_analyze_from_grammar(grammar, "c$", "S")
+        self._check_analyze_from_grammar(grammar, "ab*c$", "S")
+        self._check_analyze_from_grammar(grammar, "ab*ab*c$", "S")
+        self._check_analyze_from_grammar(grammar, "ab*$", "S", exception=SyntaxError)
+        self._check_analyze_from_grammar(grammar, "a*c$", "S", exception=SyntaxError)
+        self._check_analyze_from_grammar(grammar, "", "S", exception=SyntaxError)
+
+    def test_ll1_table_copies(self) -> None:
+        """Test that each LL(1) table from a grammar owns its cells."""
+        grammar_str = """
+        S -> aS
+        S -> b
+        """
+        grammar = GrammarFormat.read(grammar_str)
+
+        table1 = grammar.get_ll1_table()
+        table2 = grammar.get_ll1_table()
+        self.assertIsNot(table1, table2)
+        self.assertDictEqual(table1.cells, table2.cells)
+
+        table1.add_cell(TableCell('S', '$', ''))
+        self.assertNotIn(('S', '$'), table2.cells)
+        self.assertNotIn(('S', '$'), grammar.get_ll1_table().cells)
+        self.assertTrue(grammar.is_ll1())
+
+    def test_modified_cells(self) -> None:
+        """Test that analysis follows changes to the table cells."""
+        grammar_str = """
+        S -> aS
+        S -> b
+        """
+        grammar = GrammarFormat.read(grammar_str)
+
+        table = grammar.get_ll1_table()
+        self._check_analyze(table, "ab$", "S")
+        table.cells[('S', 'a')] = 'b'
+        self._check_analyze(table, "ab$", "S", exception=SyntaxError)
+
+        table = grammar.get_ll1_table()
+        self._check_analyze(table, "ab$", "S")
+        self._check_analyze(table, "ac$", "S", exception=SyntaxError)
+        table.add_cell(TableCell('S', 'c', 'c'))
+        self._check_analyze(table, "ac$", "S")
+        del table.cells[('S', 'c')]
+        self._check_analyze(table, "ac$", "S", exception=SyntaxError)
+
+        table.cells = {('S', 'a'): 'aS', ('S', 'c'): 'c'}
+        self._check_analyze(table, "ac$", "S")
+        self._check_analyze(table, "ab$", "S", exception=SyntaxError)
+
+    def test_parse_tree_eq(self) -> None:
+        """Test parse tree comparison."""
+        t1 = ParseTree("E", [ParseTree("T", [ParseTree("i")]), ParseTree("X")])
+        t2 = ParseTree("E", [ParseTree("T", [ParseTree("i")]), ParseTree("X")])
+        t3 = ParseTree("E", [ParseTree("T", [ParseTree("(")]), ParseTree("X")])
+        self.assertEqual(t1, t2)
+        self.assertEqual(hash(t1), hash(t2))
+        self.assertNotEqual(t1, t3)
+        hash(t3)
+        self.assertNotEqual(t1, t3)
+
+        leaf1 = ParseTree("λ")
+        leaf2 = ParseTree("λ")
+        self.assertIsNot(leaf1.children, leaf2.children)
+        leaf1.add_children([ParseTree("i")])
+        self.assertNotEqual(leaf1, leaf2)
+
+        child = ParseTree("T")
+        p = ParseTree("E", [child])
+        q = ParseTree("E", [ParseTree("T", [ParseTree("i")])])
+        hash(p)
+        hash(q)
+        child.add_children([ParseTree("i")])
+        self.assertEqual(p, q)
+
 '''
     def test_case3(self) -> None:
         """Test for parse tree construction."""
@@ -1,7 +1,7 @@
 import unittest
 from typing import AbstractSet
 
-from grammar.grammar import Grammar
+from grammar.grammar import Grammar, Production
 from grammar.utils import GrammarFormat
 
 class TestFirst(unittest.TestCase):
@@ -120,7 +120,71 @@ class TestFirst(unittest.TestCase):
         self._check_first(grammar, "a", {'a'})
         self._check_first(grammar, "b", {'b'})
         self._check_first(grammar, "d", {'d'})
-        
+
+
+    def test_cycle(self) -> None:
+        """Test mutually recursive non terminals."""
+        grammar_str = """
+        A->B
+        A->x
+        B->A
+        B->y
+        """
+
+        grammar = GrammarFormat.read(grammar_str)
+        self._check_first(grammar, "A", {'x', 'y'})
+        self._check_first(grammar, "B", {'x', 'y'})
+
+    def test_left_recursion(self) -> None:
+        """Test a left recursive grammar."""
+        grammar_str = """
+        E->E+T
+        E->T
+        T->i
+        """
+
+        grammar = GrammarFormat.read(grammar_str)
+        self._check_first(grammar, "E", {'i'})
+        self._check_first(grammar, "E+T", {'i'})
+        self._check_first(grammar, "T", {'i'})
+
+
+    def test_right_none(self) -> None:
+        """Test productions whose right side is None."""
+        grammar = Grammar(
+            {'a'},
+            {'S', 'A'},
+            [Production('S', 'Aa'), Production('A', None), Production('A', 'a')],
+            'S',
+        )
+        self._check_first(grammar, "A", {'', 'a'})
+        self._check_first(grammar, "S", {'a'})
+        self.assertEqual(grammar.compute_follow("A"), {'a'})
+
+    def test_shared_results(self) -> None:
+        """Test that repeated queries share correct, read-only sets."""
+        grammar_str = """
+        E -> TX
+        X -> +E
+        X ->
+        T -> iY
+        T -> (E)
+        Y -> *T
+        Y ->
+        """
+
+        grammar = GrammarFormat.read(grammar_str)
+        first_x = grammar.compute_first("X")
+        self.assertIsInstance(first_x, frozenset)
+        self.assertEqual(grammar.compute_first("YX"), {'+', '*', ''})
+        self.assertEqual(grammar.compute_first("Y+i"), {'+', '*'})
+        self.assertIs(grammar.compute_first("X"), first_x)
+        self.assertIs(grammar.compute_first("+E"), grammar.compute_first("+"))
+        self.assertEqual(first_x, {'', '+'})
+
+        follow_e = grammar.compute_follow("E")
+        self.assertIs(grammar.compute_follow("X"), follow_e)
+        self.assertEqual(follow_e, {'$', ')'})
 
 if __name__ == '__main__':
     unittest.main()
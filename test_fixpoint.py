@@ -0,0 +1,119 @@
+import random
+import unittest
+from typing import AbstractSet, Dict, List, Tuple
+from unittest import mock
+
+from grammar import _fixpoint
+from grammar.grammar import Grammar, Production
+
+
+def _random_grammar(
+    rng: random.Random,
+    n_terminals: int,
+    n_non_terminals: int,
+) -> Grammar:
+    terminals = [chr(0x100 + i) for i in range(n_terminals)]
+    non_terminals = [chr(0x41 + i) for i in range(n_non_terminals)]
+    symbols = terminals + non_terminals
+    productions = [
+        Production(
+            rng.choice(non_terminals),
+            "".join(rng.choice(symbols) for _ in range(rng.randint(0, 4))),
+        )
+        for _ in range(rng.randint(1, 3 * n_non_terminals))
+    ]
+    return Grammar(
+        set(terminals), set(non_terminals), productions, non_terminals[0],
+    )
+
+
+def _reference(
+    grammar: Grammar,
+) -> Tuple[Dict[str, AbstractSet[str]], Dict[str, AbstractSet[str]]]:
+    """Naive FIRST/FOLLOW fixed points on sets of strings."""
+    productions: List[Production] = list(grammar.productions)
+    first: Dict[str, set] = {A: set() for A in grammar.non_terminals}
+
+    def first_of(sentence: str) -> set:
+        result = set()
+        for s in sentence:
+            if s in grammar.terminals:
+                return result | {s}
+            result |= first[s] - {''}
+            if '' not in first[s]:
+                return result
+        return result | {''}
+
+    changed = True
+    while changed:
+        changed = False
+        for p in productions:
+            new = first_of(p.right)
+            if not new <= first[p.left]:
+                first[p.left] |= new
+                changed = True
+
+    follow: Dict[str, set] = {A: set() for A in grammar.non_terminals}
+    follow[grammar.axiom].add('$')
+    changed = True
+    while changed:
+        changed = False
+        for p in productions:
+            for i, s in enumerate(p.right):
+                if s in grammar.non_terminals:
+                    rest = first_of(p.right[i + 1:])
+                    new = rest - {''}
+                    if '' in rest:
+                        new |= follow[p.left]
+                    if not new <= follow[s]:
+                        follow[s] |= new
+                        changed = True
+    return first, follow
+
+
+class TestFixpoint(unittest.TestCase):
+    def _check_reference(self, grammar: Grammar) -> None:
+        first, follow = _reference(grammar)
+        for A in grammar.non_terminals:
+            self.assertEqual(grammar.compute_first(A), first[A])
+            self.assertEqual(grammar.compute_follow(A), follow[A])
+
+    def test_reference(self) -> None:
+        """Test FIRST/FOLLOW against a naive implementation."""
+        rng = random.Random(0)
+        for _ in range(200):
+            grammar = _random_grammar(
+                rng, rng.randint(1, 8), rng.randint(1, 6),
+            )
+            self._check_reference(grammar)
+
+    @unittest.skipIf(_fixpoint.first_fixpoint is None, "Numba not available")
+    def test_native_matches_python(self) -> None:
+        """Test that the Numba kernels and the Python loops agree."""
+        rng = random.Random(1)
+        for i in range(200):
+            # Up to 62 terminals, so that with '' and '$' they fill 64 bits.
+            n_terminals = 62 if i % 10 == 0 else rng.randint(1, 8)
+            grammar = _random_grammar(rng, n_terminals, rng.randint(1, 6))
+            native_first, native_follow = (
+                grammar._compute_first_follow_native()
+            )
+            self.assertEqual(grammar._compute_all_first(), native_first)
+            self.assertEqual(grammar._compute_all_follow(), native_follow)
+            self._check_reference(grammar)
+
+    def test_fallback_over_64_symbols(self) -> None:
+        """Test that grammars over 64 symbols use the Python loops."""
+        rng = random.Random(2)
+        with mock.patch.object(
+            Grammar,
+            "_compute_first_follow_native",
+            side_effect=AssertionError("native path used"),
+        ):
+            for n_terminals in (63, 70):
+                grammar = _random_grammar(rng, n_terminals, 5)
+                self._check_reference(grammar)
+
+
+if __name__ == '__main__':
+    unittest.main()